@@ -3,6 +3,9 @@ import datetime
 import random
 import time
 import csv
+from typing import Optional
+
+import numpy as np
 
 @dataclass(frozen=True)
 class MarketDataPoint:
@@ -40,24 +43,27 @@ def generate_market_csv(
     filename: str,
     num_ticks: int = 100,
     volatility: float = 0.01,
-    interval: float = 0.0
+    interval: float = 0.0,
+    seed: Optional[int] = None
 ):
     """
     Generates num_ticks of market data and writes them to a CSV file.
+    The whole random walk is drawn in one vectorized pass: timestamps start
+    now and advance by `interval` seconds per tick (at least 1 microsecond,
+    so they stay strictly increasing), without sleeping.
     """
-    gen = market_data_generator(
-        symbol=symbol,
-        start_price=start_price,
-        volatility=volatility,
-        interval=interval
-    )
+    rng = np.random.default_rng(seed)
+    deltas = rng.normal(0, volatility, num_ticks)
+    prices = np.round(start_price * np.cumprod(1 + deltas), 2)
+    step = np.timedelta64(max(int(round(interval * 1e6)), 1), 'us')
+    timestamps = np.datetime64(datetime.datetime.now(), 'us') + np.arange(num_ticks) * step
 
+    # format every row up front and hand them to the C writer in one call
+    rows = zip(np.datetime_as_string(timestamps, unit='us'), [symbol] * num_ticks, prices.tolist())
     with open(filename, 'w', newline='') as csvfile:
         writer = csv.writer(csvfile)
         writer.writerow(['timestamp', 'symbol', 'price'])
-        for _ in range(num_ticks):
-            tick = next(gen)
-            writer.writerow([tick.timestamp.isoformat(), tick.symbol, tick.price])
+        writer.writerows(rows)
 
 if __name__ == "__main__":
     # Example: generate 500 ticks for AAPL starting at $150.00 into a file
@@ -0,0 +1,289 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+# src/_csvparse.pyx
+"""
+Fast path for data_loader.load_market_data on the fixed `timestamp,symbol,price`
+layout written by data_generator.py: the file is memory-mapped and parsed straight
+into NumPy columns, with symbols interned to int32 ids as they are read.
+
+Build in place (requires Cython and a C compiler):
+    cythonize -i src/_csvparse.pyx
+
+Anything outside the fixed layout (other headers, quoted fields, timezone
+offsets, ...) raises ValueError so the caller can fall back to pandas.
+"""
+import mmap
+
+import numpy as np
+
+from cpython.buffer cimport PyObject_GetBuffer, PyBuffer_Release, PyBUF_SIMPLE
+from libc.stdint cimport int32_t, int64_t, uint64_t
+from libc.stdlib cimport free, malloc, strtod
+from libc.string cimport memchr, memcmp, memcpy
+
+cdef const char* UNKNOWN = b"UNKNOWN"
+cdef int64_t NS_PER_SEC = 1000000000
+cdef int64_t NS_PER_DAY = 86400 * NS_PER_SEC
+
+
+cdef int64_t _days_from_civil(int64_t y, int64_t m, int64_t d) nogil:
+    # days since 1970-01-01 in the proleptic Gregorian calendar
+    if m <= 2:
+        y -= 1
+    cdef int64_t era = (y if y >= 0 else y - 399) / 400
+    cdef int64_t yoe = y - era * 400
+    cdef int64_t doy = (153 * (m - 3 if m > 2 else m + 9) + 2) / 5 + d - 1
+    cdef int64_t doe = yoe * 365 + yoe / 4 - yoe / 100 + doy
+    return era * 146097 + doe - 719468
+
+
+cdef int64_t _days_in_month(int64_t y, int64_t m) nogil:
+    if m == 2:
+        return 29 if (y % 4 == 0 and y % 100 != 0) or y % 400 == 0 else 28
+    return 30 if m == 4 or m == 6 or m == 9 or m == 11 else 31
+
+
+cdef int _digits(const char* p, Py_ssize_t n, int64_t* out) nogil:
+    cdef int64_t v = 0
+    cdef Py_ssize_t i
+    for i in range(n):
+        if p[i] < 48 or p[i] > 57:
+            return -1
+        v = v * 10 + (p[i] - 48)
+    out[0] = v
+    return 0
+
+
+cdef int _parse_timestamp(const char* p, Py_ssize_t n, int64_t* out) nogil:
+    """YYYY-MM-DD[( |T)HH:MM[:SS[.fffffffff]]] -> ns since epoch; -1 if malformed."""
+    cdef int64_t year, month, day, hour = 0, minute = 0, sec = 0, frac = 0
+    cdef Py_ssize_t i, nfrac
+    if n < 10 or p[4] != 45 or p[7] != 45:  # '-'
+        return -1
+    if _digits(p, 4, &year) or _digits(p + 5, 2, &month) or _digits(p + 8, 2, &day):
+        return -1
+    if month < 1 or month > 12 or day < 1 or day > _days_in_month(year, month):
+        return -1
+    if n > 10:
+        if n < 16 or (p[10] != 84 and p[10] != 32) or p[13] != 58:  # 'T' / ' ', ':'
+            return -1
+        if _digits(p + 11, 2, &hour) or _digits(p + 14, 2, &minute) or hour > 23 or minute > 59:
+            return -1
+        if n > 16:
+            if n < 19 or p[16] != 58 or _digits(p + 17, 2, &sec) or sec > 59:
+                return -1
+            if n > 19:
+                nfrac = n - 20
+                if p[19] != 46 or nfrac < 1 or nfrac > 9 or _digits(p + 20, nfrac, &frac):  # '.'
+                    return -1
+                for i in range(9 - nfrac):
+                    frac *= 10
+    out[0] = (_days_from_civil(year, month, day) * NS_PER_DAY
+              + (hour * 3600 + minute * 60 + sec) * NS_PER_SEC + frac)
+    return 0
+
+
+cdef inline uint64_t _fnv1a(const char* p, Py_ssize_t n) nogil:
+    cdef uint64_t h = 14695981039346656037ULL
+    cdef Py_ssize_t i
+    for i in range(n):
+        h = (h ^ <unsigned char>p[i]) * 1099511628211ULL
+    return h
+
+
+cdef class _SymbolTable:
+    """Open-addressed (linear probing) map from symbol bytes to int32 id."""
+    cdef int32_t* slots
+    cdef Py_ssize_t capacity
+    cdef list names
+    cdef list name_bytes
+
+    def __cinit__(self):
+        self.capacity = 64
+        self.slots = <int32_t*>malloc(self.capacity * sizeof(int32_t))
+        if self.slots == NULL:
+            raise MemoryError()
+        for i in range(self.capacity):
+            self.slots[i] = -1
+        self.names = []
+        self.name_bytes = []
+
+    def __dealloc__(self):
+        free(self.slots)
+
+    cdef int32_t lookup(self, const char* p, Py_ssize_t n) except -1:
+        cdef Py_ssize_t mask = self.capacity - 1
+        cdef Py_ssize_t i = <Py_ssize_t>(_fnv1a(p, n) & mask)
+        cdef int32_t sid
+        cdef bytes key
+        while True:
+            sid = self.slots[i]
+            if sid < 0:
+                break
+            key = self.name_bytes[sid]
+            if len(key) == n and memcmp(<const char*>key, p, n) == 0:
+                return sid
+            i = (i + 1) & mask
+        sid = len(self.names)
+        key = p[:n]
+        self.name_bytes.append(key)
+        self.names.append(key.decode())
+        self.slots[i] = sid
+        if 2 * len(self.names) >= self.capacity:
+            self._grow()
+        return sid
+
+    cdef int _grow(self) except -1:
+        cdef Py_ssize_t new_capacity = self.capacity * 2
+        cdef int32_t* new_slots = <int32_t*>malloc(new_capacity * sizeof(int32_t))
+        cdef Py_ssize_t i, j
+        cdef bytes key
+        if new_slots == NULL:
+            raise MemoryError()
+        for i in range(new_capacity):
+            new_slots[i] = -1
+        for j, key in enumerate(self.name_bytes):
+            i = <Py_ssize_t>(_fnv1a(<const char*>key, len(key)) & (new_capacity - 1))
+            while new_slots[i] >= 0:
+                i = (i + 1) & (new_capacity - 1)
+            new_slots[i] = j
+        free(self.slots)
+        self.slots = new_slots
+        self.capacity = new_capacity
+        return 0
+
+
+cdef Py_ssize_t _row_number(const char* buf, const char* line) nogil:
+    # 1-based data row of `line` counted from the start of the file (the header is row 0);
+    # only used for error messages, so partial loads don't pay for it
+    cdef Py_ssize_t rows = 0
+    cdef const char* p = buf
+    while p < line:
+        p = <const char*>memchr(p, 10, line - p)
+        if p == NULL:
+            break
+        rows += 1
+        p += 1
+    return rows
+
+
+cdef int _fill(const char* buf, const char* end, const char* first_row, _SymbolTable table,
+               int64_t[::1] ts_out, int32_t[::1] sym_out, double[::1] price_out,
+               Py_ssize_t* n_rows) except -1:
+    cdef const char* line = buf
+    cdef const char* eol
+    cdef const char* stop
+    cdef const char* c1
+    cdef const char* c2
+    cdef const char* s
+    cdef const char* e
+    cdef const char* parse_end
+    cdef char num[64]
+    cdef Py_ssize_t row = 0, flen
+    cdef int64_t ts
+
+    # header must be exactly the fixed layout
+    eol = <const char*>memchr(line, 10, end - line)
+    stop = end if eol == NULL else eol
+    if stop > line and (stop - 1)[0] == 13:
+        stop -= 1
+    if stop - line != 22 or memcmp(line, b"timestamp,symbol,price", 22) != 0:
+        raise ValueError("header is not timestamp,symbol,price")
+    line = end if eol == NULL else eol + 1
+    if first_row > line:
+        line = first_row
+
+    while line < end:
+        eol = <const char*>memchr(line, 10, end - line)
+        stop = end if eol == NULL else eol
+        if stop > line and (stop - 1)[0] == 13:  # CRLF
+            stop -= 1
+        if stop == line:  # blank line
+            line = end if eol == NULL else eol + 1
+            continue
+        if memchr(line, 34, stop - line) != NULL:  # quoted fields are not handled here
+            raise ValueError(f"quoted field on row {_row_number(buf, line)}")
+        c1 = <const char*>memchr(line, 44, stop - line)
+        c2 = NULL if c1 == NULL else <const char*>memchr(c1 + 1, 44, stop - c1 - 1)
+        if c2 == NULL or memchr(c2 + 1, 44, stop - c2 - 1) != NULL:
+            raise ValueError(f"expected 3 fields on row {_row_number(buf, line)}")
+
+        if _parse_timestamp(line, c1 - line, &ts) < 0:
+            raise ValueError(f"unsupported timestamp on row {_row_number(buf, line)}")
+        ts_out[row] = ts
+
+        # symbol, stripped of surrounding whitespace
+        s = c1 + 1
+        e = c2
+        while s < e and (s[0] == 32 or s[0] == 9):
+            s += 1
+        while e > s and ((e - 1)[0] == 32 or (e - 1)[0] == 9):
+            e -= 1
+        if e == s:
+            sym_out[row] = table.lookup(UNKNOWN, 7)
+        else:
+            sym_out[row] = table.lookup(s, e - s)
+
+        # price via strtod on a NUL-terminated copy of the field
+        flen = stop - c2 - 1
+        if flen == 0:
+            price_out[row] = 0.0
+        else:
+            if flen >= 64:
+                raise ValueError(f"price field too long on row {_row_number(buf, line)}")
+            memcpy(num, c2 + 1, flen)
+            num[flen] = 0
+            price_out[row] = strtod(num, <char**>&parse_end)
+            if parse_end != num + flen:
+                raise ValueError(f"bad price on row {_row_number(buf, line)}")
+
+        row += 1
+        line = end if eol == NULL else eol + 1
+    n_rows[0] = row
+    return 0
+
+
+def parse_market_csv(path, Py_ssize_t start=0):
+    """
+    Parse a `timestamp,symbol,price` CSV into
+    (ts_i64, sym_i32, price_f64, sym_table): int64 nanoseconds since epoch,
+    int32 symbol ids, float64 prices and a symbol -> id dict (ids in order
+    of first appearance). Rows keep file order; empty symbols become
+    "UNKNOWN" and empty prices 0.0, as in the pandas loader.
+    `start` is a byte offset of the first row to parse (used for partial
+    loads); the header is always validated.
+    """
+    cdef Py_buffer view
+    cdef const char* buf
+    cdef const char* end
+    cdef const char* line
+    cdef const char* eol
+    cdef Py_ssize_t n_lines = 0, n_rows = 0
+    cdef _SymbolTable table = _SymbolTable()
+
+    with open(path, "rb") as fh:
+        if fh.seek(0, 2) == 0:
+            raise ValueError(f"{path} is empty")
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    PyObject_GetBuffer(mm, &view, PyBUF_SIMPLE)
+    try:
+        buf = <const char*>view.buf
+        end = buf + view.len
+
+        # line count is an upper bound on rows, for preallocation
+        line = buf + min(max(start, 0), view.len)
+        while line < end:
+            eol = <const char*>memchr(line, 10, end - line)
+            n_lines += 1
+            if eol == NULL:
+                break
+            line = eol + 1
+        ts_arr = np.empty(n_lines, dtype=np.int64)
+        sym_arr = np.empty(n_lines, dtype=np.int32)
+        price_arr = np.empty(n_lines, dtype=np.float64)
+        _fill(buf, end, buf + min(max(start, 0), view.len), table, ts_arr, sym_arr, price_arr, &n_rows)
+    finally:
+        PyBuffer_Release(&view)
+        mm.close()
+
+    return (ts_arr[:n_rows], sym_arr[:n_rows], price_arr[:n_rows],
+            {name: i for i, name in enumerate(table.names)})
@@ -0,0 +1,43 @@
+# src/_fill_loop.py
+import numpy as np
+
+from ._njit import njit
+
+# per-order status codes returned by _fill_loop
+FILL_OK = 0
+FILL_FAILED = 1     # simulated execution failure
+FILL_NO_SHORT = 2   # SELL larger than the current position
+
+@njit(cache=True)
+def _fill_loop(sides: np.ndarray, qtys: np.ndarray, prices: np.ndarray, fail_mask: np.ndarray,
+               held: int, avg: float):
+    """
+    Path-dependent part of a single-symbol fill simulation, in order:
+    failed orders are skipped, SELLs above the held quantity are rejected,
+    everything else fills at its price (same rules as Engine._execute_order).
+    `held` / `avg` are the position before the first order.
+    Returns (pos_arr, avg_price_arr, status_arr), the position after each order.
+    """
+    m = sides.shape[0]
+    pos_arr = np.zeros(m, dtype=np.int64)
+    avg_arr = np.zeros(m, dtype=np.float64)
+    status_arr = np.zeros(m, dtype=np.int8)
+    for k in range(m):
+        qty = qtys[k]
+        if fail_mask[k]:
+            status_arr[k] = FILL_FAILED
+        elif sides[k] > 0:
+            if held == 0:
+                avg = prices[k]
+            else:
+                avg = ((held * avg) + qty * prices[k]) / (held + qty)
+            held += qty
+        elif qty > held:
+            status_arr[k] = FILL_NO_SHORT
+        else:
+            held -= qty
+            if held == 0:
+                avg = 0.0
+        pos_arr[k] = held
+        avg_arr[k] = avg
+    return pos_arr, avg_arr, status_arr
@@ -0,0 +1,32 @@
+# src/_kernels.py
+"""
+Single place that picks the compiled kernels used by strategies.py and engine.py:
+the ahead-of-time `trading_kernels` build (python -m src._kernels_aot) when it
+is present and not older than the kernel sources, otherwise the
+@njit(cache=True) kernels (plain Python without numba).
+"""
+from pathlib import Path
+
+__all__ = ["ma_crossover", "fill_loop"]
+
+# a build older than any of these may have stale semantics or signatures
+_KERNEL_SOURCES = ("_ma_loop.py", "_fill_loop.py", "_kernels_aot.py")
+
+
+def _is_current(module) -> bool:
+    src_dir = Path(__file__).resolve().parent
+    built = Path(module.__file__).stat().st_mtime
+    return all((src_dir / name).stat().st_mtime <= built for name in _KERNEL_SOURCES)
+
+
+try:
+    from . import trading_kernels as _aot
+except ImportError:
+    _aot = None
+
+if _aot is not None and _is_current(_aot):
+    ma_crossover = _aot.ma_crossover
+    fill_loop = _aot.fill_loop
+else:
+    from ._fill_loop import _fill_loop as fill_loop
+    from ._ma_loop import _ma_crossover_loop as ma_crossover
@@ -0,0 +1,27 @@
+# src/_kernels_aot.py
+"""
+Ahead-of-time build of the numba kernels into the `trading_kernels`
+extension module, so short backtests don't pay JIT warmup on their first run.
+Build once (requires numba and a C compiler):
+    python -m src._kernels_aot
+The extension is written next to this file; src/_kernels.py uses it when
+present and rebuilt since the kernel sources last changed, and otherwise
+falls back to the @njit(cache=True) kernels.
+"""
+from pathlib import Path
+
+from numba.pycc import CC
+
+from ._fill_loop import _fill_loop
+from ._ma_loop import _ma_crossover_loop
+
+cc = CC("trading_kernels")
+cc.output_dir = str(Path(__file__).resolve().parent)
+
+# export the plain Python functions behind the njit dispatchers
+cc.export("ma_crossover", "i1[:](f8[:], i8, i8)")(_ma_crossover_loop.py_func)
+cc.export("fill_loop", "Tuple((i8[:], f8[:], i1[:]))(i1[:], i8[:], f8[:], b1[:], i8, f8)")(_fill_loop.py_func)
+
+
+if __name__ == "__main__":
+    cc.compile()
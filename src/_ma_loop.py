@@ -0,0 +1,74 @@
+import math
+import sys
+
+import numpy as np
+
+from ._njit import njit
+
+# running-sum MAs closer than this (relative) are re-decided on exact window sums
+MA_TIE_RTOL = 1e-9
+
+# sum() of floats is compensated (Neumaier) from Python 3.12 on and plain
+# left-to-right before; _window_sum follows the running interpreter's rule
+_COMPENSATED_SUM = sys.version_info >= (3, 12)
+
+
+@njit(cache=True)
+def _window_sum(prices: np.ndarray, start: int, stop: int) -> float:
+    # the same result as sum(prices[start:stop]) on this interpreter
+    total = 0.0
+    if not _COMPENSATED_SUM:
+        for j in range(start, stop):
+            total += prices[j]
+        return total
+    comp = 0.0
+    for j in range(start, stop):
+        x = prices[j]
+        t = total + x
+        if abs(total) >= abs(x):
+            comp += (total - t) + x
+        else:
+            comp += (x - t) + total
+        total = t
+    if comp != 0.0 and math.isfinite(comp):
+        total += comp
+    return total
+
+
+@njit(cache=True)
+def _ma_crossover_loop(prices: np.ndarray, short_w: int, long_w: int) -> np.ndarray:
+    """
+    SMA crossover over a whole price series in one pass.
+    Returns an int8 array aligned with `prices`: +1 BUY, -1 SELL, 0 no signal,
+    following the same rules as MovingAverageCrossover.generate_signals.
+    Window sums are kept as running totals, so each tick costs O(1); they are
+    re-summed exactly every long_w ticks to stop float drift building up, and
+    near-ties are decided on exact window sums (computed as sum() does on the
+    running interpreter, see _window_sum) so equal MAs never signal.
+    """
+    n = prices.shape[0]
+    signals = np.zeros(n, dtype=np.int8)
+    s_short = 0.0
+    s_long = 0.0
+    last = 0  # last emitted signal
+    for i in range(n):
+        p = prices[i]
+        s_short += p - (prices[i - short_w] if i >= short_w else 0.0)
+        s_long += p - (prices[i - long_w] if i >= long_w else 0.0)
+        if (i + 1) % long_w == 0:
+            s_short = _window_sum(prices, i + 1 - short_w, i + 1)
+            s_long = _window_sum(prices, i + 1 - long_w, i + 1)
+        if i < long_w - 1:
+            continue
+        short_ma = s_short / short_w
+        long_ma = s_long / long_w
+        if abs(short_ma - long_ma) <= MA_TIE_RTOL * abs(long_ma):
+            short_ma = _window_sum(prices, i + 1 - short_w, i + 1) / short_w
+            long_ma = _window_sum(prices, i + 1 - long_w, i + 1) / long_w
+        if short_ma > long_ma and last != 1:
+            signals[i] = 1
+            last = 1
+        elif short_ma < long_ma and last != -1:
+            signals[i] = -1
+            last = -1
+    return signals
@@ -0,0 +1,13 @@
+# src/_njit.py
+"""
+numba.njit when numba is installed, otherwise a no-op decorator so the
+kernels still run (as plain Python) without it.
+"""
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - depends on environment
+    def njit(*args, **kwargs):
+        # supports both @njit and @njit(cache=True, ...)
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -1,38 +1,229 @@
 # src/data_loader.py
 import csv
+import os
 from datetime import datetime
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
 from pathlib import Path
 
-from models import MarketDataPoint
+import numpy as np
+import pandas as pd
 
+from .models import TickBuffer
 
-def load_market_data(csv_path: str) -> List[MarketDataPoint]:
+try:
+    # optional Cython fast path, built with `cythonize -i src/_csvparse.pyx`
+    from ._csvparse import parse_market_csv
+except ImportError:
+    parse_market_csv = None
+
+# accepted header names, in order of preference
+TIMESTAMP_COLUMNS = ("timestamp", "time", "date")
+SYMBOL_COLUMNS = ("symbol", "ticker")
+PRICE_COLUMNS = ("price", "close")
+
+# block size used when scanning a file backwards for partial loads
+TAIL_CHUNK_SIZE = 6 * 1024
+
+
+def _pick_column(header: List[str], candidates: Tuple[str, ...]):
+    return next((c for c in candidates if c in header), None)
+
+
+def _lines_backward(fh, size: int, chunk_size: int = TAIL_CHUNK_SIZE) -> Iterator[Tuple[int, bytes]]:
+    """Yield (offset, line) for each line of a binary file, last line first."""
+    pos = size
+    tail = b""
+    while pos > 0:
+        step = min(chunk_size, pos)
+        pos -= step
+        fh.seek(pos)
+        block = fh.read(step) + tail
+        lines = block.split(b"\n")
+        # the first piece may continue in the previous block
+        tail = lines[0]
+        end = pos + len(block)
+        for line in reversed(lines[1:]):
+            start = end - len(line)
+            yield start, line
+            end = start - 1
+    yield 0, tail
+
+
+def _parse_timestamp(raw: str) -> datetime:
+    # try ISO first, fallback to common format
+    try:
+        return datetime.fromisoformat(raw)
+    except ValueError:
+        return datetime.strptime(raw, "%Y-%m-%d %H:%M:%S")
+
+
+def _tail_offset(path: Path, ts_index: int, last_n: Optional[int] = None,
+                 since: Optional[datetime] = None) -> int:
     """
-    Load CSV into a sorted list of MarketDataPoint.
-    Expected CSV header: timestamp,symbol,price
-    timestamp should be ISO format or "%Y-%m-%d %H:%M:%S"
+    Byte offset of the first data row to load so that only the last `last_n`
+    rows and/or the rows stamped at or after `since` are read (0: whole file).
+    The file is read backwards in TAIL_CHUNK_SIZE blocks and only until the
+    boundary is found, which assumes rows are chronological on disk.
+    """
+    offset = 0
+    with path.open("rb") as fh:
+        size = os.stat(fh.fileno()).st_size
+        if last_n is not None:
+            if last_n <= 0:
+                return size
+            count = 0
+            for start, line in _lines_backward(fh, size):
+                if start == 0:
+                    break  # reached the header: every row is needed
+                if not line.strip():
+                    continue
+                count += 1
+                if count == last_n:
+                    offset = start
+                    break
+        if since is not None:
+            for start, line in _lines_backward(fh, size):
+                if start == 0 or start < offset:
+                    break
+                if not line.strip():
+                    continue
+                raw = line.split(b",")[ts_index].decode().strip()
+                if _parse_timestamp(raw) < since:
+                    # rows after this one are the ones on or after `since`
+                    offset = start + len(line) + 1
+                    break
+    return offset
+
+
+def load_market_data_df(csv_path: str, *, last_n: Optional[int] = None,
+                        since: Optional[datetime] = None, presorted: bool = False) -> pd.DataFrame:
+    """
+    Load CSV into a DataFrame with columns timestamp, symbol, price,
+    sorted chronologically. Parsing is done by the pandas C reader.
+    Expected CSV header: timestamp,symbol,price (time/date, ticker and close
+    are accepted as alternatives).
+    `last_n` / `since` load only the tail of the file (see _tail_offset);
+    this requires the file to be chronologically sorted on disk, as the
+    CSV written by data_generator.py is.
+    Rows are only sorted when they are out of order; `presorted=True` skips
+    even the check.
     """
     path = Path(csv_path)
     if not path.exists():
         raise FileNotFoundError(f"{csv_path} not found")
 
-    rows = []
+    # resolve column names from the header once, not per row
     with path.open(newline='') as fh:
-        reader = csv.DictReader(fh)
-        for i, row in enumerate(reader):
-            ts_raw = row.get("timestamp") or row.get("time") or row.get("date")
-            if ts_raw is None:
-                raise ValueError(f"Missing timestamp on row {i+1}")
-            # try ISO first, fallback to common format
-            try:
-                ts = datetime.fromisoformat(ts_raw)
-            except Exception:
-                ts = datetime.strptime(ts_raw, "%Y-%m-%d %H:%M:%S")
-            symbol = row.get("symbol") or row.get("ticker") or "UNKNOWN"
-            price = float(row.get("price") or row.get("close") or 0)
-            rows.append(MarketDataPoint(timestamp=ts, symbol=symbol.strip(), price=float(price)))
-
-    # sort by timestamp to ensure chronological order
-    rows.sort(key=lambda r: r.timestamp)
-    return rows
+        header = next(csv.reader(fh), [])
+    ts_col = _pick_column(header, TIMESTAMP_COLUMNS)
+    if ts_col is None:
+        raise ValueError(f"{csv_path} has no timestamp column")
+    symbol_col = _pick_column(header, SYMBOL_COLUMNS)
+    price_col = _pick_column(header, PRICE_COLUMNS)
+
+    usecols = [c for c in (ts_col, symbol_col, price_col) if c is not None]
+    dtype = {c: t for c, t in ((ts_col, "str"), (symbol_col, "category"), (price_col, "float64")) if c is not None}
+    offset = 0
+    if last_n is not None or since is not None:
+        offset = _tail_offset(path, header.index(ts_col), last_n=last_n, since=since)
+    with path.open("rb") as fh:
+        if offset:
+            fh.seek(offset)
+        df = pd.read_csv(fh, engine="c", usecols=usecols, dtype=dtype,
+                         names=header if offset else None, header=None if offset else "infer")
+    df = df.rename(columns={ts_col: "timestamp", symbol_col: "symbol", price_col: "price"})
+
+    raw = df["timestamp"]
+    missing = raw.isna()
+    if missing.any():
+        raise ValueError(f"Missing timestamp on row {int(np.argmax(missing.to_numpy())) + 1}")
+    # bulk parse; cache=True parses each distinct string only once
+    ts = pd.to_datetime(raw, format="ISO8601", cache=True, errors="coerce")
+    bad = ts.isna()
+    if bad.any():
+        # fallback to common format for the rows ISO parsing rejected
+        ts[bad] = pd.to_datetime(raw[bad], format="%Y-%m-%d %H:%M:%S", cache=True, errors="coerce")
+        bad = ts.isna()
+        if bad.any():
+            row = int(np.argmax(bad.to_numpy()))
+            raise ValueError(f"Unparseable timestamp {raw.iloc[row]!r} on row {row + 1}")
+    df["timestamp"] = ts.dt.as_unit("ns")
+    if symbol_col is None:
+        df["symbol"] = pd.Categorical(["UNKNOWN"] * len(df))
+    else:
+        categories = df["symbol"].cat.categories
+        stripped = categories.str.strip()
+        if not stripped.equals(categories):
+            df["symbol"] = df["symbol"].astype(str).str.strip().astype("category")
+        if df["symbol"].isna().any():
+            df["symbol"] = df["symbol"].cat.add_categories(["UNKNOWN"]).fillna("UNKNOWN")
+    df["price"] = 0.0 if price_col is None else df["price"].fillna(0.0)
+
+    df = df[["timestamp", "symbol", "price"]]
+    if not presorted and not df["timestamp"].is_monotonic_increasing:
+        # sort by timestamp to ensure chronological order (stable, like list.sort)
+        df = df.sort_values("timestamp", kind="mergesort").reset_index(drop=True)
+    return df
+
+
+def load_market_data(csv_path: str, *, last_n: Optional[int] = None,
+                     since: Optional[datetime] = None, presorted: bool = False) -> TickBuffer:
+    """
+    Load CSV into a chronologically sorted TickBuffer.
+    Expected CSV header: timestamp,symbol,price
+    timestamp should be ISO format or "%Y-%m-%d %H:%M:%S"
+    Symbol ids are assigned in order of first appearance.
+    `last_n` / `since` load only the tail of a chronologically sorted file,
+    reading time proportional to the rows needed rather than the file size.
+    Rows are only sorted when they are out of order; `presorted=True` skips
+    even the check.
+    Uses the compiled parser for the plain timestamp,symbol,price layout when
+    it is built, and pandas otherwise.
+    """
+    if parse_market_csv is not None:
+        path = Path(csv_path)
+        if not path.exists():
+            raise FileNotFoundError(f"{csv_path} not found")
+        try:
+            offset = 0
+            if last_n is not None or since is not None:
+                offset = _tail_offset(path, 0, last_n=last_n, since=since)
+            ts, symbol_ids, prices, symbol_table = parse_market_csv(str(csv_path), offset)
+        except ValueError:
+            pass  # layout outside the fast path, let pandas handle it
+        else:
+            if not presorted and np.any(ts[1:] < ts[:-1]):
+                order = np.argsort(ts, kind="stable")
+                ts, symbol_ids, prices = ts[order], symbol_ids[order], prices[order]
+                # renumber ids by first appearance in the sorted rows, as the pandas path does
+                uniq, first = np.unique(symbol_ids, return_index=True)
+                old_ids = uniq[np.argsort(first)]
+                remap = np.empty(len(symbol_table), dtype=np.int32)
+                remap[old_ids] = np.arange(len(old_ids), dtype=np.int32)
+                symbol_ids = remap[symbol_ids]
+                names = sorted(symbol_table, key=symbol_table.get)
+                symbol_table = {names[old]: new for new, old in enumerate(old_ids.tolist())}
+            return TickBuffer(
+                timestamps=ts,
+                symbol_ids=symbol_ids,
+                prices=prices,
+                symbol_table=symbol_table,
+            )
+
+    df = load_market_data_df(csv_path, last_n=last_n, since=since, presorted=presorted)
+    codes, uniques = pd.factorize(df["symbol"], sort=False)
+    return TickBuffer(
+        timestamps=df["timestamp"].to_numpy(dtype="datetime64[ns]").view(np.int64),
+        symbol_ids=codes.astype(np.int32),
+        prices=df["price"].to_numpy(dtype=np.float64),
+        symbol_table={str(sym): i for i, sym in enumerate(uniques)},
+    )
+
+
+def load_market_columns(csv_path: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, int]]:
+    """
+    Load CSV as the parallel (timestamps, symbol_ids, prices, symbol_table)
+    columns expected by Engine.run_vectorized.
+    """
+    ticks = load_market_data(csv_path)
+    return ticks.timestamps, ticks.symbol_ids, ticks.prices, ticks.symbol_table
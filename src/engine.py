@@ -1,9 +1,28 @@
 # src/engine.py
-import random
-from typing import List, Dict, Tuple
+from collections import defaultdict, deque
+from dataclasses import asdict
+from itertools import islice
+from typing import Callable, Deque, List, Dict, Optional, Tuple
 from datetime import datetime
 
-from .models import MarketDataPoint, Order, OrderError, ExecutionError
+import numpy as np
+
+from .models import TickBuffer, Position, Order, OrderError, ExecutionError, ns_to_datetimes
+from .strategies import Strategy, fast_path
+from ._fill_loop import FILL_OK, FILL_FAILED
+from ._kernels import fill_loop as _fill_loop
+
+# number of log lines reported by summary(): the first ones of the run
+SUMMARY_LOGS = 20
+
+# log record formatters, applied only when the logs are read
+_STRATEGY_ERROR = "Strategy error for {} at tick {}: {}".format
+_STRATEGY_VEC_ERROR = "Strategy error for {}: {}".format
+_ORDER_ERROR = "OrderError: {} -> {}".format
+
+
+def _execution_error(reason: str, symbol: str, side: str, quantity: int, price: float) -> str:
+    return f"ExecutionError: {reason} -> {Order.describe(symbol, side, quantity, price, 'FAILED')}"
 
 
 class Engine:
@@ -15,15 +34,51 @@ class Engine:
     - Records positions and equity curve
     """
 
-    def __init__(self, strategies: List, initial_cash: float = 100000.0, rng_seed: int = 42, execution_failure_rate: float = 0.0):
+    def __init__(self, strategies: List, initial_cash: float = 100000.0, rng_seed: int = 42, execution_failure_rate: float = 0.0,
+                 max_logs: int = 1000, log_sample_rate: int = 1):
+        if log_sample_rate < 1:
+            raise ValueError("log_sample_rate must be >= 1")
         self.strategies = strategies
         self.cash = float(initial_cash)
         self.initial_cash = float(initial_cash)
-        self.positions: Dict[str, Dict[str, float]] = {}  # symbol -> {'quantity': int, 'avg_price': float}
-        self.equity_curve: List[Tuple[datetime, float]] = []
-        self.logs: List[str] = []
+        self.positions: Dict[str, Position] = {}
+        # equity snapshot per tick of the latest run, preallocated once the input length is known;
+        # timestamps stay int64 ns and only become datetimes in equity_curve
+        self.equity_ts = np.empty(0, dtype=np.int64)
+        self.equity_val = np.empty(0, dtype=np.float64)
+        # ring buffer of the most recent (formatter, args) records; see format_logs()
+        self.logs: Deque[Tuple[Callable[..., str], tuple]] = deque(maxlen=max_logs)
+        # the first SUMMARY_LOGS records, kept for summary() after the ring buffer wraps
+        self._first_logs: List[Tuple[Callable[..., str], tuple]] = []
+        # keep one in every log_sample_rate records
+        self.log_sample_rate = int(log_sample_rate)
+        self._log_count = 0
+        # per-order arrays (tick, symbol_id, side, quantity, price, status) from run_vectorized
+        self.order_arrays: Dict[str, np.ndarray] = {}
         self.execution_failure_rate = float(execution_failure_rate)
-        random.seed(rng_seed)
+        self._rng = np.random.default_rng(rng_seed)
+        # pre-drawn failure flags consumed one per executed order
+        self._fail_draws: List[bool] = []
+        self._fail_idx = 0
+        self._fail_block = 1024
+
+    @property
+    def equity_curve(self) -> List[Tuple[datetime, float]]:
+        """(timestamp, equity) pairs built from equity_ts / equity_val."""
+        return list(zip(ns_to_datetimes(self.equity_ts), self.equity_val.tolist()))
+
+    def _log(self, formatter: Callable[..., str], *args):
+        """Record a log entry; the text is built by format_logs(), so evicted entries are never formatted."""
+        if self._log_count % self.log_sample_rate == 0:
+            record = (formatter, args)
+            self.logs.append(record)
+            if len(self._first_logs) < SUMMARY_LOGS:
+                self._first_logs.append(record)
+        self._log_count += 1
+
+    def format_logs(self, limit: Optional[int] = None) -> List[str]:
+        """Text of the retained log records, oldest first (at most `limit` of them)."""
+        return [formatter(*args) for formatter, args in islice(self.logs, limit)]
 
     def _validate_order(self, order: Order):
         if order.quantity <= 0:
@@ -31,29 +86,52 @@ class Engine:
         if order.price <= 0:
             raise OrderError("price must be > 0")
 
+    def _next_failure(self) -> bool:
+        """Next pre-drawn failure flag, refilled from self._rng a block at a time."""
+        if self._fail_idx >= len(self._fail_draws):
+            self._fail_draws = (self._rng.random(self._fail_block) < self.execution_failure_rate).tolist()
+            self._fail_idx = 0
+        failed = self._fail_draws[self._fail_idx]
+        self._fail_idx += 1
+        return failed
+
+    def _next_failures(self, m: int) -> np.ndarray:
+        """The next m failure flags, taken from the same blocks as m _next_failure() calls."""
+        flags: List[bool] = []
+        while len(flags) < m:
+            if self._fail_idx >= len(self._fail_draws):
+                self._fail_draws = (self._rng.random(self._fail_block) < self.execution_failure_rate).tolist()
+                self._fail_idx = 0
+            take = min(m - len(flags), len(self._fail_draws) - self._fail_idx)
+            flags += self._fail_draws[self._fail_idx:self._fail_idx + take]
+            self._fail_idx += take
+        return np.array(flags, dtype=bool)
+
     def _execute_order(self, order: Order):
         """
         Simulate execution: may raise ExecutionError if random failure triggers.
         Assumes immediate fill at order.price; BUY reduces cash, SELL increases cash.
         """
         # possible simulated failure
-        if random.random() < self.execution_failure_rate:
+        if self.execution_failure_rate > 0 and self._next_failure():
             raise ExecutionError("simulated execution failure")
 
         qty = order.quantity if order.side == "BUY" else -order.quantity
         symbol = order.symbol
         price = order.price
-        position = self.positions.get(symbol, {"quantity": 0, "avg_price": 0.0})
+        position = self.positions.get(symbol)
+        if position is None:
+            position = Position()
         # BUY
         if qty > 0:
             total_cost = qty * price
             # update avg price
-            existing_qty = position["quantity"]
+            existing_qty = position.quantity
             if existing_qty == 0:
-                position["avg_price"] = price
+                position.avg_price = price
             else:
-                position["avg_price"] = ((existing_qty * position["avg_price"]) + total_cost) / (existing_qty + qty)
-            position["quantity"] = existing_qty + qty
+                position.avg_price = ((existing_qty * position.avg_price) + total_cost) / (existing_qty + qty)
+            position.quantity = existing_qty + qty
             self.cash -= total_cost
             order.status = "FILLED"
             order.filled_quantity = qty
@@ -61,14 +139,14 @@ class Engine:
         else:
             # SELL
             sell_qty = -qty
-            existing_qty = position["quantity"]
+            existing_qty = position.quantity
             if sell_qty > existing_qty:
                 # allow short? For simplicity, prevent selling more than we have (raise)
                 raise ExecutionError(f"attempt to sell {sell_qty} but only {existing_qty} held")
-            position["quantity"] = existing_qty - sell_qty
+            position.quantity = existing_qty - sell_qty
             # if position reduced to zero, zero avg_price
-            if position["quantity"] == 0:
-                position["avg_price"] = 0.0
+            if position.quantity == 0:
+                position.avg_price = 0.0
             self.cash += sell_qty * price
             order.status = "FILLED"
             order.filled_quantity = sell_qty
@@ -76,61 +154,355 @@ class Engine:
 
         self.positions[symbol] = position
 
-    def _market_value(self, current_tick: MarketDataPoint):
+    def _market_value(self, symbol: str, price: float):
+        """Cash plus positions, marking `symbol` at `price` (the current tick)."""
         total = self.cash
         for sym, pos in self.positions.items():
-            qty = pos["quantity"]
+            qty = pos.quantity
             if qty == 0:
                 continue
-            if sym == current_tick.symbol:
-                price = current_tick.price
+            if sym == symbol:
+                mark = price
             else:
                 # fallback to avg_price if no recent price for other symbols
-                price = pos["avg_price"]
-            total += qty * price
+                mark = pos.avg_price
+            total += qty * mark
         return total
 
-    def run(self, market_data: List[MarketDataPoint]):
+    @staticmethod
+    def _has_fast_path(strat: Strategy) -> bool:
+        # an on_price inherited from above a generate_signals override would skip it
+        return fast_path(strat, "on_price") is not None
+
+    def _process_signals(self, signals: List):
+        """Convert signals into orders and attempt execution, logging rejects and failures."""
+        for action, symbol, qty, price in signals:
+            try:
+                order = Order(symbol=symbol, side=action, quantity=qty, price=price)
+                self._validate_order(order)
+                try:
+                    self._execute_order(order)
+                except ExecutionError as ee:
+                    order.status = "FAILED"
+                    self._log(_execution_error, str(ee), symbol, action, order.quantity, order.price)
+            except OrderError as oe:
+                self._log(_ORDER_ERROR, str(oe), (action, symbol, qty, price))
+
+    def run(self, market_data: TickBuffer):
         """
         Main loop: for each tick, get signals from strategies, convert to orders,
         attempt execution, and append equity snapshot.
+        Accepts a TickBuffer (or any sequence of MarketDataPoint, converted once).
         """
-        for tick in market_data:
+        if not isinstance(market_data, TickBuffer):
+            market_data = TickBuffer.from_points(market_data)
+        n = len(market_data)
+        # one signal per tick is the usual upper bound on orders, so failures are drawn in blocks of n
+        self._fail_block = max(n, 1)
+        self.equity_ts = market_data.timestamps.copy()
+        self.equity_val = np.empty(n, dtype=np.float64)
+        # plain Python scalars index faster than NumPy elements
+        symbol_ids = market_data.symbol_ids.tolist()
+        prices = market_data.prices.tolist()
+        # indexed per run, so strategies added to self.strategies after __init__ are included:
+        # symbol -> strategies trading it, in list order; strategies without a symbol see every tick
+        strategies = list(self.strategies)
+        by_symbol: Dict[str, List[Strategy]] = defaultdict(list)
+        all_symbols: List[Strategy] = []
+        for strat in strategies:
+            sym = getattr(strat, "symbol", None)
+            if sym is None:
+                all_symbols.append(strat)
+            else:
+                by_symbol[sym].append(strat)
+
+        if len(strategies) == 1 and not all_symbols and self._has_fast_path(strategies[0]):
+            strat_id = market_data.symbol_table.get(strategies[0].symbol, -1)
+            self._run_single(strategies[0], strat_id, symbol_ids, prices, market_data.symbols)
+            return
+
+        # dispatch table indexed by symbol id: (strategy, has fast path) pairs in list order
+        dispatch = []
+        for sym in market_data.symbols:
+            group = by_symbol.get(sym, [])
+            if all_symbols:
+                group = [s for s in strategies if s in group or s in all_symbols]
+            dispatch.append([(s, self._has_fast_path(s)) for s in group])
+
+        log = self._log
+        process = self._process_signals
+        market_value = self._market_value
+        symbols = market_data.symbols
+        equity_val = self.equity_val
+        for i in range(n):
+            sid = symbol_ids[i]
+            price = prices[i]
             # collect signals
             signals = []
-            for strat in self.strategies:
+            for strat, has_fast in dispatch[sid]:
                 try:
-                    s = strat.generate_signals(tick)
+                    if has_fast:
+                        s = strat.on_price(price)
+                    else:
+                        s = strat.generate_signals(market_data[i])
                     if s:
                         signals.extend(s)
                 except Exception as e:
-                    self.logs.append(f"Strategy error for {strat}: {e}")
+                    log(_STRATEGY_ERROR, strat, i, str(e))
 
-            # process signals into orders
-            for action, symbol, qty, price in signals:
-                try:
-                    order = Order(symbol=symbol, side=action, quantity=qty, price=price)
-                    self._validate_order(order)
-                    try:
-                        self._execute_order(order)
-                    except ExecutionError as ee:
-                        order.status = "FAILED"
-                        self.logs.append(f"ExecutionError: {ee} -> {order}")
-                except OrderError as oe:
-                    self.logs.append(f"OrderError: {oe} -> {(action, symbol, qty, price)}")
+            if signals:
+                process(signals)
 
             # record equity snapshot
             try:
-                equity = self._market_value(tick)
+                equity = market_value(symbols[sid], price)
             except Exception:
                 equity = self.cash  # fallback
-            self.equity_curve.append((tick.timestamp, equity))
+            equity_val[i] = equity
+
+    def _single_position_state(self, symbol: str):
+        """
+        (cash, quantity, avg_price, fused) for the fused single-symbol loop;
+        `fused` is False once positions exist in any other symbol.
+        """
+        pos = self.positions.get(symbol)
+        fused = len(self.positions) == (0 if pos is None else 1)
+        if pos is None:
+            return self.cash, 0, 0.0, fused
+        return self.cash, pos.quantity, pos.avg_price, fused
+
+    def _run_single(self, strat: Strategy, strat_id: int, symbol_ids: List[int], prices: List[float],
+                    symbols: List[str]):
+        """
+        run() specialised for one strategy with an on_price fast path.
+        Strategy errors are exceptional, so instead of a try/except per tick
+        the whole loop is guarded once and resumed after the failing tick;
+        `in_strategy` marks exceptions raised by on_price itself, anything else
+        (e.g. a malformed signal reaching _process_signals) propagates as in
+        the multi-strategy loop.
+        While the strategy's symbol is the only position, the equity snapshot
+        is computed inline from cached cash/quantity (refreshed only after
+        orders) instead of walking self.positions in _market_value every tick.
+        """
+        on_price = strat.on_price
+        process = self._process_signals
+        market_value = self._market_value
+        single_state = self._single_position_state
+        equity_val = self.equity_val
+        symbol = strat.symbol
+        n = len(prices)
+        i = 0
+        in_strategy = False
+        while i < n:
+            cash, qty, avg, fused = single_state(symbol)
+            try:
+                for i in range(i, n):
+                    sid = symbol_ids[i]
+                    price = prices[i]
+                    if sid == strat_id:
+                        in_strategy = True
+                        signals = on_price(price)
+                        in_strategy = False
+                        if signals:
+                            process(signals)
+                            cash, qty, avg, fused = single_state(symbol)
+                        mark = price
+                    else:
+                        # other symbols' ticks mark the position at avg_price, as _market_value does
+                        mark = avg
+                    if fused:
+                        equity_val[i] = cash + qty * mark if qty else cash
+                    else:
+                        try:
+                            equity = market_value(symbols[sid], price)
+                        except Exception:
+                            equity = self.cash  # fallback
+                        equity_val[i] = equity
+                return
+            except Exception as e:
+                if not in_strategy:
+                    raise
+                in_strategy = False
+                self._log(_STRATEGY_ERROR, strat, i, str(e))
+                try:
+                    equity = market_value(symbols[symbol_ids[i]], prices[i])
+                except Exception:
+                    equity = self.cash  # fallback
+                equity_val[i] = equity
+                i += 1
+
+    def _simulate_fills_vec(self, sides: np.ndarray, qtys: np.ndarray, prices: np.ndarray, fail_mask: np.ndarray,
+                            start: Position = None):
+        """
+        Vectorized broker for one symbol's orders (in time order).
+        `sides` is +1 BUY / -1 SELL, `fail_mask` marks simulated failures and
+        `start` is the position held before the first order (flat if None).
+        The no-short check runs in a compiled pass; cash is a cumulative sum.
+        Returns (cash_arr, pos_arr, avg_price_arr, status_arr), each value
+        taken after the corresponding order; status_arr holds FILL_* codes.
+        """
+        # exact dtypes, as the ahead-of-time kernel has a fixed signature
+        sides = np.ascontiguousarray(sides, dtype=np.int8)
+        qtys = np.ascontiguousarray(qtys, dtype=np.int64)
+        prices = np.ascontiguousarray(prices, dtype=np.float64)
+        start = start or Position()
+        pos_arr, avg_arr, status_arr = _fill_loop(sides, qtys, prices, np.ascontiguousarray(fail_mask, dtype=np.bool_),
+                                                  int(start.quantity), float(start.avg_price))
+        signed = np.where(status_arr == FILL_OK, sides * qtys, 0)
+        cash_arr = np.cumsum(np.concatenate(([self.cash], -signed * prices)))[1:]
+        return cash_arr, pos_arr, avg_arr, status_arr
+
+    def run_vectorized(self, prices: np.ndarray, symbol_ids: np.ndarray, timestamps: np.ndarray,
+                       symbol_table: Dict[str, int]):
+        """
+        Array counterpart of run(): strategies emit whole signal arrays through
+        generate_signals_vec and cash, positions and equity are built with
+        cumulative sums instead of per-tick updates.
+        Inputs are the parallel columns from load_market_columns; each symbol's
+        orders go through _simulate_fills_vec and the timelines are merged by
+        tick index. run() remains the reference implementation; both produce the
+        same fills and equity curve.
+        `timestamps` are int64 ns since the epoch (datetime64 arrays are converted).
+        Every strategy needs a symbol and its own generate_signals_vec; anything
+        else raises TypeError before the run starts.
+        """
+        vec_paths = []
+        for strat in self.strategies:
+            vec = fast_path(strat, "generate_signals_vec")
+            if vec is None:
+                raise TypeError(f"{type(strat).__name__} has no generate_signals_vec; use run() instead")
+            if getattr(strat, "symbol", None) is None:
+                raise TypeError(f"{type(strat).__name__} has no symbol; use run() instead")
+            vec_paths.append((strat, vec))
+
+        prices = np.asarray(prices, dtype=np.float64)
+        symbol_ids = np.asarray(symbol_ids, dtype=np.int32)
+        n = len(prices)
+        symbols = [None] * len(symbol_table)
+        for sym, sid in symbol_table.items():
+            symbols[sid] = sym
+
+        # collect every strategy's signals as flat order arrays
+        tick_parts, side_parts, qty_parts = [], [], []
+        for strat, vec in vec_paths:
+            sid = symbol_table.get(strat.symbol)
+            if sid is None:
+                continue
+            rows = np.flatnonzero(symbol_ids == sid)
+            try:
+                actions, qtys = vec(prices[rows])
+            except Exception as e:
+                self._log(_STRATEGY_VEC_ERROR, strat, str(e))
+                continue
+            fired = np.flatnonzero(actions)
+            tick_parts.append(rows[fired])
+            side_parts.append(actions[fired])
+            qty_parts.append(qtys[fired])
+
+        if tick_parts:
+            tick_idx = np.concatenate(tick_parts)
+            # stable sort keeps strategy order within a tick, as in run()
+            order = np.argsort(tick_idx, kind="stable")
+            tick_idx = tick_idx[order]
+            sides = np.concatenate(side_parts)[order]
+            qtys = np.concatenate(qty_parts)[order]
+        else:
+            tick_idx = np.empty(0, dtype=np.int64)
+            sides = np.empty(0, dtype=np.int8)
+            qtys = np.empty(0, dtype=np.int64)
+        syms = symbol_ids[tick_idx]
+        fill_prices = prices[tick_idx]
+
+        # validated once for all orders; ones the Order constructor would reject never reach execution
+        valid = (qtys > 0) & (fill_prices > 0)
+        for k in np.flatnonzero(~valid):
+            reason = "quantity must be > 0" if qtys[k] <= 0 else "price must be > 0"
+            action = "BUY" if sides[k] > 0 else "SELL"
+            self._log(_ORDER_ERROR, reason, (action, symbols[syms[k]], int(qtys[k]), float(fill_prices[k])))
+        tick_idx, sides, qtys, syms, fill_prices = (a[valid] for a in (tick_idx, sides, qtys, syms, fill_prices))
+
+        m = len(sides)
+        # one failure flag per order that reaches execution, drawn in blocks of n and
+        # keeping the unused tail as run() does, so both paths fail the same orders
+        # and leave self._rng in the same state, run after run
+        if self.execution_failure_rate > 0:
+            self._fail_block = max(n, 1)
+            fail_mask = self._next_failures(m)
+        else:
+            fail_mask = np.zeros(m, dtype=bool)
+
+        # the no-short rule is per symbol, so each symbol's orders are simulated on their own,
+        # starting from whatever position the engine already holds in it
+        pos_after = np.zeros(m, dtype=np.int64)
+        avg_after = np.zeros(m, dtype=np.float64)
+        status = np.zeros(m, dtype=np.int8)
+        traded = np.unique(syms)
+        for s in traded:
+            own = np.flatnonzero(syms == s) if len(traded) > 1 else slice(None)
+            cash_own, pos_after[own], avg_after[own], status[own] = self._simulate_fills_vec(
+                sides[own], qtys[own], fill_prices[own], fail_mask[own], self.positions.get(symbols[s]))
+
+        for k in np.flatnonzero(status != FILL_OK):
+            if status[k] == FILL_FAILED:
+                reason = "simulated execution failure"
+            else:
+                reason = f"attempt to sell {qtys[k]} but only {pos_after[k]} held"
+            self._log(_execution_error, reason, symbols[syms[k]], "BUY" if sides[k] > 0 else "SELL",
+                      int(qtys[k]), float(fill_prices[k]))
+        # orders are kept as parallel arrays rather than Order objects
+        self.order_arrays = {
+            "tick": tick_idx, "symbol_id": syms, "side": sides, "quantity": qtys,
+            "price": fill_prices, "status": status,
+        }
+
+        # cash after each order in global time order, then the last value at or before each tick
+        filled = np.where(status == FILL_OK, sides * qtys, 0)
+        if len(traded) == 1:
+            cash_after = np.concatenate(([self.cash], cash_own))
+        else:
+            cash_after = np.cumsum(np.concatenate(([self.cash], -filled * fill_prices)))
+        cash_arr = cash_after[np.searchsorted(tick_idx, np.arange(n), side="right")]
+
+        # positions in the order run() would record them: those already held,
+        # then newly traded symbols by first fill
+        executed = syms[filled != 0]
+        uniq, first = np.unique(executed, return_index=True)
+        names = list(self.positions)
+        names += [symbols[s] for s in uniq[np.argsort(first)] if symbols[s] not in self.positions]
+        equity = cash_arr.copy()
+        for name in names:
+            start = self.positions.get(name) or Position()
+            s = symbol_table.get(name)
+            if s is None:
+                # not in this data: always marked at avg_price, as in _market_value
+                if start.quantity:
+                    equity += start.quantity * start.avg_price
+                continue
+            own = np.flatnonzero(syms == s)
+            if len(own):
+                last = np.searchsorted(tick_idx[own], np.arange(n), side="right") - 1
+                pos_arr = np.where(last >= 0, pos_after[own][last], start.quantity)
+                avg_arr = np.where(last >= 0, avg_after[own][last], start.avg_price)
+                self.positions[name] = Position(quantity=int(pos_after[own][-1]), avg_price=float(avg_after[own][-1]))
+            else:
+                pos_arr = np.full(n, start.quantity, dtype=np.int64)
+                avg_arr = np.full(n, start.avg_price, dtype=np.float64)
+            # mark at the tick price for the ticking symbol, avg_price otherwise
+            mark = np.where(symbol_ids == s, prices, avg_arr)
+            equity += np.where(pos_arr != 0, pos_arr * mark, 0.0)
+
+        self.cash = float(cash_arr[-1]) if n else self.cash
+        timestamps = np.asarray(timestamps)
+        if timestamps.dtype.kind == "M":
+            timestamps = timestamps.astype("datetime64[ns]").view(np.int64)
+        self.equity_ts = np.array(timestamps, dtype=np.int64)
+        self.equity_val = equity
 
     def summary(self):
         return {
             "initial_cash": self.initial_cash,
             "final_cash": self.cash,
-            "positions": self.positions,
-            "equity_curve_length": len(self.equity_curve),
-            "logs": self.logs[:20]
+            "positions": {sym: asdict(pos) for sym, pos in self.positions.items()},
+            "equity_curve_length": len(self.equity_val),
+            "logs": [formatter(*args) for formatter, args in self._first_logs]
         }
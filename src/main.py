@@ -32,9 +32,9 @@ def main():
     engine.run(market_data)
 
     # compute metrics
-    tr = total_return(engine.equity_curve, engine.initial_cash)
-    sr = sharpe_ratio(engine.equity_curve)
-    mdd = max_drawdown(engine.equity_curve)
+    tr = total_return(engine.equity_val, engine.initial_cash)
+    sr = sharpe_ratio(engine.equity_val)
+    mdd = max_drawdown(engine.equity_val)
 
     summary = engine.summary()
     summary.update({
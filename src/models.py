@@ -1,7 +1,9 @@
 # src/models.py
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
 
 
 @dataclass(frozen=True)
@@ -12,6 +14,61 @@ class MarketDataPoint:
     price: float
 
 
+def ns_to_datetimes(ns: np.ndarray) -> List[datetime]:
+    """int64 nanoseconds since the epoch -> naive datetimes (microsecond precision)."""
+    return np.asarray(ns, dtype=np.int64).view("datetime64[ns]").astype("datetime64[us]").tolist()
+
+
+@dataclass
+class TickBuffer:
+    """
+    Struct-of-arrays tick storage: one NumPy column per field instead of one
+    MarketDataPoint object per tick.
+    `symbol_ids` index into `symbols`; `symbol_table` is the reverse mapping.
+    Indexing returns a MarketDataPoint view, so a TickBuffer can stand in for
+    the old List[MarketDataPoint].
+    Timestamps are int64 nanoseconds since the epoch; datetimes are only
+    built on access (__getitem__, ns_to_datetimes).
+    """
+    timestamps: np.ndarray  # int64 ns
+    symbol_ids: np.ndarray  # int32
+    prices: np.ndarray      # float64
+    symbol_table: Dict[str, int]
+    symbols: List[str] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.symbols = [None] * len(self.symbol_table)
+        for sym, sid in self.symbol_table.items():
+            self.symbols[sid] = sym
+
+    @classmethod
+    def from_points(cls, points: Sequence[MarketDataPoint]) -> "TickBuffer":
+        symbol_table: Dict[str, int] = {}
+        return cls(
+            timestamps=np.array([p.timestamp for p in points], dtype="datetime64[ns]").view(np.int64),
+            symbol_ids=np.array([symbol_table.setdefault(p.symbol, len(symbol_table)) for p in points], dtype=np.int32),
+            prices=np.array([p.price for p in points], dtype=np.float64),
+            symbol_table=symbol_table,
+        )
+
+    def __len__(self):
+        return len(self.prices)
+
+    def __getitem__(self, i: int) -> MarketDataPoint:
+        return MarketDataPoint(
+            timestamp=self.timestamps[i].view("datetime64[ns]").astype("datetime64[us]").item(),
+            symbol=self.symbols[self.symbol_ids[i]],
+            price=float(self.prices[i]),
+        )
+
+
+@dataclass(slots=True)
+class Position:
+    """Held quantity and average entry price for one symbol."""
+    quantity: int = 0
+    avg_price: float = 0.0
+
+
 class OrderError(Exception):
     """Raised for invalid orders (bad quantity, price, etc.)."""
     pass
@@ -29,6 +86,8 @@ class Order:
     `quantity` is positive integer (number of units).
     `price` is the limit price for execution (float).
     """
+    __slots__ = ("symbol", "side", "quantity", "price", "status", "filled_quantity", "fill_price")
+
     def __init__(self, symbol: str, side: str, quantity: int, price: float):
         if side not in ("BUY", "SELL"):
             raise OrderError("side must be 'BUY' or 'SELL'")
@@ -45,6 +104,10 @@ class Order:
         self.filled_quantity = 0
         self.fill_price: Optional[float] = None
 
+    @staticmethod
+    def describe(symbol: str, side: str, quantity: int, price: float, status: str) -> str:
+        """repr() text for an order, usable without building an Order."""
+        return f"Order({side} {quantity} {symbol} @ {price:.2f} status={status})"
+
     def __repr__(self):
-        return (f"Order({self.side} {self.quantity} {self.symbol} @ {self.price:.2f} "
-                f"status={self.status})")
\ No newline at end of file
+        return Order.describe(self.symbol, self.side, self.quantity, self.price, self.status)
@@ -1,29 +1,88 @@
 # src/reporting.py
-import pandas as pd
+from typing import Optional
+
 import numpy as np
 
-def calculate_total_return(df: pd.DataFrame) -> float:
+SECONDS_PER_YEAR = 365.25 * 24 * 3600
+
+
+def _returns(values: np.ndarray) -> np.ndarray:
+    return np.diff(values) / values[:-1]
+
+
+def elapsed_seconds(timestamps: np.ndarray) -> np.ndarray:
+    """Seconds between consecutive int64-nanosecond timestamps (e.g. Engine.equity_ts)."""
+    return np.diff(np.asarray(timestamps, dtype=np.int64)) / 1e9
+
+
+def annualization_factor(timestamps: np.ndarray) -> float:
     """
-    Calculates total return percentage based on the first and last price.
+    Annualization factor implied by the median spacing of the distinct
+    int64-nanosecond timestamps (ticks sharing a time, e.g. several symbols
+    per second, count once), for use as sharpe_ratio(..., periods_per_year=...).
+    Raises ValueError when there are fewer than two distinct times.
     """
-    if df.empty or 'price' not in df.columns:
+    dt = elapsed_seconds(np.unique(np.asarray(timestamps, dtype=np.int64)))
+    if dt.size == 0:
+        raise ValueError("annualization_factor needs at least two distinct timestamps")
+    return SECONDS_PER_YEAR / float(np.median(dt))
+
+
+def total_return(equity: np.ndarray, initial: Optional[float] = None) -> float:
+    """
+    Total return of an equity curve as a fraction (0.05 == +5%),
+    measured from `initial` when given, otherwise from the first value.
+    """
+    eq = np.asarray(equity, dtype=np.float64)
+    if eq.size == 0:
         return 0.0
-    start_price = df['price'].iloc[0]
-    end_price = df['price'].iloc[-1]
-    total_return = ((end_price - start_price) / start_price) * 100
-    return float(round(total_return, 2))
+    start = eq[0] if initial is None else float(initial)
+    if start == 0:
+        return 0.0
+    return float(eq[-1] / start - 1.0)
+
 
-def calculate_sharpe_ratio(df: pd.DataFrame, risk_free_rate: float = 0.0) -> float:
+def sharpe_ratio(equity: np.ndarray, risk_free_rate: float = 0.0, periods_per_year: float = 252) -> float:
     """
-    Calculates the Sharpe ratio given price data.
+    Annualized Sharpe ratio of the per-period returns of an equity curve.
+    `periods_per_year` can come from annualization_factor(timestamps).
     """
-    if df.empty or 'price' not in df.columns:
+    if periods_per_year <= 0:
+        raise ValueError("periods_per_year must be > 0")
+    eq = np.asarray(equity, dtype=np.float64)
+    if eq.size < 3:
         return 0.0
-    df['returns'] = df['price'].pct_change().dropna()
-    excess_returns = df['returns'] - (risk_free_rate / 252)
-    std_dev = excess_returns.std()
-    mean_excess = excess_returns.mean()
+    excess = _returns(eq) - (risk_free_rate / periods_per_year)
+    std_dev = excess.std(ddof=1)
     if std_dev == 0 or np.isnan(std_dev):
         return 0.0
-    sharpe = (mean_excess / std_dev) * np.sqrt(252)
-    return float(round(sharpe, 2))
+    return float(excess.mean() / std_dev * np.sqrt(periods_per_year))
+
+
+def max_drawdown(equity: np.ndarray) -> float:
+    """
+    Largest peak-to-trough decline of an equity curve as a non-positive
+    fraction (-0.2 == 20% below the running peak), in one vectorized pass.
+    """
+    eq = np.asarray(equity, dtype=np.float64)
+    if eq.size == 0:
+        return 0.0
+    return float((eq / np.maximum.accumulate(eq) - 1.0).min())
+
+
+def calculate_total_return(df) -> float:
+    """
+    Calculates total return percentage based on the first and last price.
+    """
+    if len(df) == 0 or 'price' not in df:
+        return 0.0
+    return float(round(total_return(df['price']) * 100, 2))
+
+
+def calculate_sharpe_ratio(df, risk_free_rate: float = 0.0) -> float:
+    """
+    Calculates the Sharpe ratio given price data.
+    """
+    if len(df) == 0 or 'price' not in df:
+        return 0.0
+    return float(round(sharpe_ratio(df['price'], risk_free_rate), 2))
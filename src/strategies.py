@@ -1,20 +1,55 @@
 # src/strategies.py
 from abc import ABC, abstractmethod
 from collections import deque
-from typing import List, Tuple
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
 
 from .models import MarketDataPoint
 
+from ._kernels import ma_crossover as _ma_crossover_loop
+from ._ma_loop import MA_TIE_RTOL
+
 Signal = Tuple[str, str, int, float]
 # (ACTION, SYMBOL, QTY, PRICE) where ACTION is "BUY" or "SELL"
 
 
+def fast_path(strat, name: str) -> Optional[Callable]:
+    """
+    strat.<name> (the on_price / generate_signals_vec fast paths), or None when
+    it is unset or inherited from above the class that defines generate_signals:
+    a subclass that overrides only generate_signals must not be bypassed.
+    """
+    for klass in type(strat).__mro__:
+        if name in klass.__dict__:
+            return None if klass.__dict__[name] is None else getattr(strat, name)
+        if "generate_signals" in klass.__dict__:
+            return None
+    return None
+
+
 class Strategy(ABC):
+    # symbol the strategy trades; Engine only dispatches that symbol's ticks to it
+    symbol: str
+
     @abstractmethod
     def generate_signals(self, tick: MarketDataPoint) -> List[Signal]:
         """Return a list of signals given a MarketDataPoint."""
         pass
 
+    # Optional scalar fast path for Engine.run: a method on_price(price) -> List[Signal]
+    # taking the price of a tick the engine has already matched to this strategy's
+    # symbol, so no tick object or symbol comparison is needed. Strategies that
+    # leave it as None are driven through generate_signals instead.
+    on_price: Optional[Callable[[float], List[Signal]]] = None
+
+    # Optional array counterpart of generate_signals for Engine.run_vectorized: a method
+    # generate_signals_vec(prices) -> (actions, qtys). `prices` holds every tick for this
+    # strategy's symbol, in order, and the strategy is assumed to start from a fresh
+    # state; actions is int8 aligned with `prices` (+1 BUY, -1 SELL, 0 no signal).
+    # run_vectorized refuses strategies that leave it as None.
+    generate_signals_vec: Optional[Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]]] = None
+
 
 class MovingAverageCrossover(Strategy):
     """
@@ -28,27 +63,56 @@ class MovingAverageCrossover(Strategy):
         self.symbol = symbol
         self.short_window = short_window
         self.long_window = long_window
-        self._prices = deque(maxlen=long_window)
+        # one window per MA plus running sums, so each tick is O(1);
+        # the sums are re-summed exactly every long_window ticks to bound float drift
+        self._short_prices = deque(maxlen=short_window)
+        self._long_prices = deque(maxlen=long_window)
+        self._sum_short = 0.0
+        self._sum_long = 0.0
+        self._ticks = 0
         self._last_signal = None  # "BUY" or "SELL" or None
 
     def generate_signals(self, tick: MarketDataPoint):
         if tick.symbol != self.symbol:
             return []
-        self._prices.append(tick.price)
-        if len(self._prices) < self.long_window:
+        return self.on_price(tick.price)
+
+    def on_price(self, price: float):
+        # add the new price and drop the one leaving each full window
+        short_prices, long_prices = self._short_prices, self._long_prices
+        self._sum_short += price - (short_prices[0] if len(short_prices) == self.short_window else 0.0)
+        self._sum_long += price - (long_prices[0] if len(long_prices) == self.long_window else 0.0)
+        short_prices.append(price)
+        long_prices.append(price)
+        self._ticks += 1
+        if self._ticks % self.long_window == 0:
+            self._sum_short = sum(short_prices)
+            self._sum_long = sum(long_prices)
+        if len(long_prices) < self.long_window:
             return []
 
-        long_ma = sum(list(self._prices)[-self.long_window:]) / self.long_window
-        short_ma = sum(list(self._prices)[-self.short_window:]) / self.short_window
+        long_ma = self._sum_long / self.long_window
+        short_ma = self._sum_short / self.short_window
+        if abs(short_ma - long_ma) <= MA_TIE_RTOL * abs(long_ma):
+            # too close to call on running sums: decide on the exact window sums,
+            # so equal MAs stay a tie as with the original sum() per tick
+            long_ma = sum(long_prices) / self.long_window
+            short_ma = sum(short_prices) / self.short_window
 
         if short_ma > long_ma and self._last_signal != "BUY":
             self._last_signal = "BUY"
-            return [("BUY", self.symbol, 1, tick.price)]
+            return [("BUY", self.symbol, 1, price)]
         elif short_ma < long_ma and self._last_signal != "SELL":
             self._last_signal = "SELL"
-            return [("SELL", self.symbol, 1, tick.price)]
+            return [("SELL", self.symbol, 1, price)]
         return []
 
+    def generate_signals_vec(self, prices: np.ndarray):
+        # one compiled pass per backtest instead of one Python call per tick
+        actions = _ma_crossover_loop(np.ascontiguousarray(prices, dtype=np.float64),
+                                     self.short_window, self.long_window)
+        return actions, (actions != 0).astype(np.int64)
+
 
 class MomentumStrategy(Strategy):
     """
@@ -64,14 +128,30 @@ class MomentumStrategy(Strategy):
     def generate_signals(self, tick: MarketDataPoint):
         if tick.symbol != self.symbol:
             return []
-        self._prices.append(tick.price)
+        return self.on_price(tick.price)
+
+    def on_price(self, price: float):
+        self._prices.append(price)
         if len(self._prices) <= self.lookback:
             return []
         current = self._prices[-1]
         prev = self._prices[0]
         ret = (current / prev) - 1.0
         if ret > self.threshold:
-            return [("BUY", self.symbol, 1, tick.price)]
+            return [("BUY", self.symbol, 1, price)]
         elif ret < -self.threshold:
-            return [("SELL", self.symbol, 1, tick.price)]
+            return [("SELL", self.symbol, 1, price)]
         return []
+
+    def generate_signals_vec(self, prices: np.ndarray):
+        prices = np.asarray(prices, dtype=np.float64)
+        n = len(prices)
+        actions = np.zeros(n, dtype=np.int8)
+        qtys = np.zeros(n, dtype=np.int64)
+        if n <= self.lookback:
+            return actions, qtys
+
+        ret = (prices[self.lookback:] / prices[:n - self.lookback]) - 1.0
+        actions[self.lookback:] = np.where(ret > self.threshold, 1, np.where(ret < -self.threshold, -1, 0))
+        qtys[actions != 0] = 1
+        return actions, qtys